@@ -6,14 +6,87 @@ Processes all recipe images in assets/recipe_images/ and organizes outputs
 
 import os
 import sys
+import errno
+import multiprocessing
 import shutil
-import subprocess
+import queue
+import threading
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import argparse
 
 
+# Common image extensions (lowercase)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
+
+# OCR pipeline owned by each worker process (created once by _init_worker)
+_worker_pipeline = None
+
+
+def _init_worker(code_dir, model, thread_budget):
+    """
+    Create the OCR pipeline (and its HTTP session) once per worker process
+    
+    Args:
+        code_dir: Directory containing recipe_ocr.py
+        model: Ollama model to use
+        thread_budget: Threads Tesseract and OpenCV may use in this worker
+            (None to leave their defaults)
+    """
+    global _worker_pipeline
+    
+    # Split the cores between workers so Tesseract (OpenMP) and OpenCV thread
+    # pools don't oversubscribe the CPU; must be set before Tesseract loads
+    if thread_budget is not None:
+        os.environ["OMP_THREAD_LIMIT"] = str(thread_budget)
+    
+    if code_dir not in sys.path:
+        sys.path.insert(0, code_dir)
+    import cv2
+    from recipe_ocr import RecipeOCRPipeline
+    
+    if thread_budget is not None:
+        cv2.setNumThreads(thread_budget)
+    
+    _worker_pipeline = RecipeOCRPipeline(ollama_model=model, debug_dir=code_dir)
+
+
+def _move_file(src, dst):
+    """
+    Move a file with a single rename, copying only across filesystems
+    
+    Args:
+        src: Source path
+        dst: Destination path
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
+
+
+def _ocr_one(image_path, debug):
+    """
+    Run the OCR stage for one image inside a worker process
+    
+    Args:
+        image_path: Path to the image file
+        debug: Enable debug mode for OCR
+        
+    Returns:
+        str: Cleaned OCR text
+    """
+    print(f"Running OCR on: {Path(image_path).name}")
+    return _worker_pipeline.extract_clean_text(image_path, debug=debug)
+
+
 class BatchRecipeProcessor:
-    def __init__(self, project_root=None, model="llama3.1:8b", debug=False):
+    def __init__(self, project_root=None, model="llama3.1:8b", debug=False, workers=None,
+                 llm_workers=2):
         """
         Initialize the batch processor
         
@@ -21,6 +94,8 @@ class BatchRecipeProcessor:
             project_root: Root directory of the project (auto-detected if None)
             model: Ollama model to use
             debug: Enable debug mode for OCR
+            workers: Number of OCR worker processes (default: CPU count, 1 in debug mode)
+            llm_workers: Number of threads waiting on Ollama
         """
         # Auto-detect project root or use provided
         if project_root is None:
@@ -46,6 +121,66 @@ class BatchRecipeProcessor:
         
         # Validate structure
         self._validate_structure()
+        
+        # Debug images use fixed filenames, so only one worker can write them
+        if workers is None:
+            workers = 1 if debug else os.cpu_count()
+        self.workers = workers
+        self.llm_workers = llm_workers
+        
+        # Persistent OCR pool (CPU-bound), reused across batches
+        self.ocr_pool = self._create_ocr_pool()
+        
+        # LLM calls are network-bound, so threads are enough to overlap them with OCR
+        self.llm_pool = ThreadPoolExecutor(max_workers=self.llm_workers)
+        
+        # Pipeline used by the LLM threads in this process
+        if str(self.code_dir) not in sys.path:
+            sys.path.insert(0, str(self.code_dir))
+        from recipe_ocr import RecipeOCRPipeline
+        
+        self.pipeline = RecipeOCRPipeline(ollama_model=self.model)
+    
+    def _create_ocr_pool(self):
+        """
+        Start the OCR worker pool; each worker loads the OCR pipeline
+        (cv2, numpy, pytesseract) once in its initializer
+        
+        Workers are not forked from this process: the pool can be (re)started
+        while LLM threads hold locks (e.g. stdout), which a forked child would
+        inherit locked.
+        
+        Returns:
+            ProcessPoolExecutor: The worker pool
+        """
+        # A single worker can use every core; otherwise share them out
+        if self.workers == 1:
+            thread_budget = None
+        else:
+            thread_budget = max(1, (os.cpu_count() or 1) // self.workers)
+        
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("forkserver")
+        else:
+            mp_context = multiprocessing.get_context("spawn")
+        
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(str(self.code_dir), self.model, thread_budget)
+        )
+    
+    def close(self, cancel=False):
+        """
+        Shut down the OCR and LLM pools
+        
+        Args:
+            cancel: Drop queued images instead of finishing them (e.g. on Ctrl-C);
+                only work that is already running is waited for
+        """
+        self.ocr_pool.shutdown(cancel_futures=cancel)
+        self.llm_pool.shutdown(cancel_futures=cancel)
     
     def _validate_structure(self):
         """Validate that the expected folder structure exists"""
@@ -86,95 +221,125 @@ class BatchRecipeProcessor:
         Returns:
             list: List of Path objects for image files
         """
-        # Common image extensions
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
-        
-        images = []
-        for file_path in self.recipe_images_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in image_extensions:
-                images.append(file_path)
+        # scandir reuses the file type from the directory listing, so no extra stat per file
+        with os.scandir(self.recipe_images_dir) as entries:
+            images = [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
         
         return sorted(images)
     
-    def process_image(self, image_path):
+    def _submit_ocr(self, images, slots, results):
         """
-        Process a single recipe image
+        Feed images to the OCR pool, staying at most `slots` images ahead of the LLM stage
+        
+        Args:
+            images: List of Path objects for image files
+            slots: Semaphore bounding the images in flight
+            results: Queue receiving (image_path, markdown_path, error) tuples
+        """
+        for image_path in images:
+            slots.acquire()
+            try:
+                future = self._submit_to_ocr_pool(image_path)
+            except Exception as e:
+                slots.release()
+                results.put((image_path, None, f"Unexpected error: {str(e)}"))
+                continue
+            
+            future.add_done_callback(partial(self._on_ocr_done, image_path, slots, results))
+    
+    def _submit_to_ocr_pool(self, image_path):
+        """
+        Submit one image to the OCR pool, replacing the pool if a worker crashed
+        
+        A worker dying (e.g. OpenCV crashing on a corrupt image) breaks the whole
+        pool: images already in flight fail, but later images get a fresh pool.
         
         Args:
             image_path: Path to the image file
             
         Returns:
-            tuple: (success: bool, markdown_path: Path or None, error: str or None)
+            Future: Future for the cleaned OCR text
+        """
+        try:
+            return self.ocr_pool.submit(_ocr_one, str(image_path), self.debug)
+        except BrokenProcessPool:
+            print("OCR worker crashed, restarting worker pool")
+            self.ocr_pool.shutdown(wait=False)
+            self.ocr_pool = self._create_ocr_pool()
+            return self.ocr_pool.submit(_ocr_one, str(image_path), self.debug)
+    
+    def _on_ocr_done(self, image_path, slots, results, future):
+        """Hand a finished OCR future to the LLM thread pool"""
+        try:
+            self.llm_pool.submit(self._run_llm, image_path, future, slots, results)
+        except Exception as e:
+            slots.release()
+            results.put((image_path, None, f"Unexpected error: {str(e)}"))
+    
+    def _run_llm(self, image_path, future, slots, results):
         """
-        print(f"\n{'='*60}")
-        print(f"Processing: {image_path.name}")
-        print(f"{'='*60}")
+        Run the LLM stage for one image on the cleaned OCR text
         
+        Args:
+            image_path: Path to the image file
+            future: Future returned by submitting _ocr_one
+            slots: Semaphore bounding the images in flight
+            results: Queue receiving (image_path, markdown_path, error) tuples
+        """
         try:
-            # Build command
-            cmd = [
-                "python3",
-                str(self.ocr_script),
-                str(image_path),
-                "-m", self.model
-            ]
-            
-            if self.debug:
-                cmd.append("--debug")
-            
-            # Run the OCR script
-            # Note: OCR script will create markdown in current directory
-            result = subprocess.run(
-                cmd,
-                cwd=str(self.code_dir),  # Run from code directory
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
+            cleaned_text = future.result()
+            print(f"Running LLM on: {image_path.name}")
+            md_path = self.pipeline.text_to_markdown(
+                cleaned_text,
+                output_dir=self.markdown_dir,
+                debug=self.debug
             )
+            results.put((image_path, Path(md_path), None))
+        except BrokenProcessPool:
+            results.put((image_path, None, "OCR worker crashed while processing this batch"))
+        except Exception as e:
+            results.put((image_path, None, f"Unexpected error: {str(e)}"))
+        finally:
+            slots.release()
+    
+    def _collect_result(self, image_path, md_path, error):
+        """
+        Collect a finished image and move it to processed_images
+        
+        Args:
+            image_path: Path to the image file
+            md_path: Path of the markdown file written to the markdown directory
+            error: Error message from the OCR or LLM stage, if any
             
-            if result.returncode != 0:
-                error_msg = f"OCR script failed:\n{result.stderr}"
-                print(f"✗ Error: {error_msg}")
-                return False, None, error_msg
-            
-            # Find the generated markdown file
-            # The OCR script creates it with the recipe title as filename
-            # It will be in the code directory where we ran the script
-            
-            # Look for the most recently created .md file in code directory
-            md_files = list(self.code_dir.glob("*.md"))
-            if not md_files:
-                # Also check for _ocr.txt files to see if OCR ran
-                ocr_files = list(self.code_dir.glob("*_ocr.txt"))
-                error_msg = f"No markdown file generated. OCR files found: {len(ocr_files)}"
-                print(f"✗ Error: {error_msg}")
-                return False, None, error_msg
-            
-            # Get the most recently modified .md file
-            latest_md = max(md_files, key=lambda p: p.stat().st_mtime)
-            
-            # Move markdown to markdown directory
-            final_md_path = self.markdown_dir / latest_md.name
-            shutil.move(str(latest_md), str(final_md_path))
-            print(f"✓ Markdown saved to: {final_md_path}")
+        Returns:
+            tuple: (success: bool, markdown_path: Path or None, error: str or None)
+        """
+        print(f"Finished: {image_path.name}")
+        
+        if error is not None:
+            print(f"✗ Error: {error}")
+            return False, None, error
+        
+        try:
+            print(f"✓ Markdown saved to: {md_path}")
             
             # Move image to processed_images directory
             final_image_path = self.processed_images_dir / image_path.name
-            shutil.move(str(image_path), str(final_image_path))
+            _move_file(image_path, final_image_path)
             print(f"✓ Image moved to: {final_image_path}")
             
-            # Clean up any debug files and OCR text files in code directory
-            for pattern in ["debug_*.jpg", "*_ocr.txt"]:
-                for debug_file in self.code_dir.glob(pattern):
+            # Clean up the debug images the OCR workers wrote to the code directory
+            if self.debug:
+                for debug_file in self.code_dir.glob("debug_*.jpg"):
                     debug_file.unlink()
             
             print(f"✓ Successfully processed {image_path.name}")
-            return True, final_md_path, None
+            return True, md_path, None
             
-        except subprocess.TimeoutExpired:
-            error_msg = "Processing timeout (>5 minutes)"
-            print(f"✗ Error: {error_msg}")
-            return False, None, error_msg
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             print(f"✗ Error: {error_msg}")
@@ -191,7 +356,7 @@ class BatchRecipeProcessor:
         
         if not images:
             print(f"\nNo images found in {self.recipe_images_dir}")
-            print("Supported formats: .jpg, .jpeg, .png, .gif, .bmp, .tiff, .webp")
+            print(f"Supported formats: {', '.join(IMAGE_EXTENSIONS)}")
             return {
                 'total': 0,
                 'successful': 0,
@@ -199,16 +364,35 @@ class BatchRecipeProcessor:
                 'results': []
             }
         
-        print(f"\nFound {len(images)} image(s) to process\n")
+        print(f"\nFound {len(images)} image(s) to process with {self.workers} worker(s)\n")
         
         results = []
         successful = 0
         failed = 0
         
-        for i, image_path in enumerate(images, 1):
+        # OCR workers feed LLM threads; enough slots to keep both stages busy
+        # while bounding how far OCR can run ahead of the LLM
+        slots = threading.BoundedSemaphore(self.workers + self.llm_workers)
+        stage_results = queue.Queue()
+        feeder = threading.Thread(
+            target=self._submit_ocr,
+            args=(images, slots, stage_results),
+            daemon=True
+        )
+        feeder.start()
+        
+        # Load the model once while the first images are in OCR, so no image
+        # pays the model-load cost
+        self.pipeline.warmup()
+        
+        # This thread is the single writer: file moves happen here
+        # Every stage is time-bounded (Tesseract passes and Ollama requests have
+        # timeouts), so each image eventually reports success or an error
+        for i in range(1, len(images) + 1):
+            image_path, stage_md_path, stage_error = stage_results.get()
             print(f"\n[{i}/{len(images)}]", end=" ")
             
-            success, md_path, error = self.process_image(image_path)
+            success, md_path, error = self._collect_result(image_path, stage_md_path, stage_error)
             
             results.append({
                 'image': image_path.name,
@@ -272,19 +456,29 @@ def main():
         action="store_true",
         help="Enable debug mode (saves preprocessing images and shows OCR output)"
     )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count, 1 with --debug)"
+    )
     
     args = parser.parse_args()
     
+    processor = None
+    finished = False
     try:
         # Create processor
         processor = BatchRecipeProcessor(
             project_root=args.project_root,
             model=args.model,
-            debug=args.debug
+            debug=args.debug,
+            workers=args.workers
         )
         
         # Process all images
         summary = processor.process_all()
+        finished = True
         
         # Print summary
         processor.print_summary(summary)
@@ -300,6 +494,10 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        # On an error or Ctrl-C, don't wait for queued OCR/LLM work
+        if processor is not None:
+            processor.close(cancel=not finished)
 
 
 if __name__ == "__main__":
@@ -15,18 +15,201 @@ from PIL import Image
 import pytesseract
 import requests
 
+# Optional: persistent Tesseract API, avoids reloading language data per image
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Optional: JIT-compiled pixel counting, a defensive fallback only; every
+# standard OpenCV build has countNonZero, so this is normally never used
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Characters stripped from recipe titles to build filenames
+_TITLE_SANITIZE = re.compile(r'[^\w\s-]')
+
+# Runs of blank lines collapsed by clean_ocr_text
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n')
+
+# Plain-text fractions (including the common l-for-1 OCR error) and their glyphs
+_FRACTION_RE = re.compile(r'[l1]/2|[l1]/4|3/4|1/3|2/3')
+_FRACTION_MAP = {
+    '1/2': '½',
+    'l/2': '½',
+    '1/4': '¼',
+    'l/4': '¼',
+    '3/4': '¾',
+    '1/3': '⅓',
+    '2/3': '⅔',
+}
+
+# Tesseract confidence thresholds (0-100): below the mean, retry with PSM 3;
+# at or below the word threshold, drop the word
+_MIN_MEAN_CONFIDENCE = 60
+_MIN_WORD_CONFIDENCE = 30
+
+# Seconds before a Tesseract pass is abandoned (pytesseract or tesserocr)
+_TESSERACT_TIMEOUT = 60
+
+# How long Ollama keeps the model loaded after each request
+_OLLAMA_KEEP_ALIVE = "1h"
+
+# Header fields and their defaults when the LLM leaves them out
+_HEADER_DEFAULTS = {
+    'title': 'Untitled Recipe',
+    'origin': 'Unknown',
+    'servings': 'Unknown',
+    'prep_time': 'Unknown',
+    'cook_time': 'Unknown',
+    'total_time': 'Unknown',
+}
+
+# Note keys in the order they appear, with their markdown labels
+_NOTE_LABELS = (
+    ('make_ahead', 'Make-Ahead'),
+    ('substitutions', 'Substitutions'),
+    ('storage', 'Storage'),
+    ('tips', 'Tips'),
+    ('scaling', 'Scaling'),
+    ('family_notes', 'Family Notes'),
+)
+
+# Cookbook template header, filled by generate_markdown
+_MARKDOWN_HEADER = """---
+cssclass: cookbook
+tags: recipe
+---
+# {title}
+
+<div class="recipe-origin">
+<strong>Origin:</strong> {origin}
+</div>
+
+<div class="recipe-meta">
+<span><strong>Serves:</strong> {servings}</span>
+<span><strong>Prep Time:</strong> {prep_time}</span>
+<span><strong>Cook Time:</strong> {cook_time}</span>
+<span><strong>Total Time:</strong> {total_time}</span>
+</div>
+
+"""
+
+
+def _safe_filename(title):
+    """
+    Turn a recipe title into a filesystem-safe file stem
+    
+    Args:
+        title: Recipe title
+        
+    Returns:
+        str: Sanitized filename without extension
+    """
+    return _TITLE_SANITIZE.sub('', title).strip().replace(' ', '_')
+
+
+def _join_words(words):
+    """
+    Rebuild OCR text from recognized words, dropping low-confidence ones
+    
+    Args:
+        words: Iterable of ((block, paragraph, line), word, confidence) tuples
+        
+    Returns:
+        tuple: (text: str, mean_confidence: float)
+    """
+    # Group confident words by (block, paragraph, line) to keep the card's layout
+    lines = []
+    confidences = []
+    for key, word, conf in words:
+        if conf < 0 or not word.strip():
+            continue
+        
+        confidences.append(conf)
+        if conf <= _MIN_WORD_CONFIDENCE:
+            continue
+        
+        if not lines or lines[-1][0] != key:
+            lines.append((key, []))
+        lines[-1][1].append(word)
+    
+    # Blank line between paragraphs, like image_to_string
+    text_lines = []
+    previous_key = None
+    for key, line_words in lines:
+        if previous_key is not None and key[:2] != previous_key[:2]:
+            text_lines.append('')
+        text_lines.append(' '.join(line_words))
+        previous_key = key
+    
+    mean_conf = float(np.mean(confidences)) if confidences else 0.0
+    return '\n'.join(text_lines), mean_conf
+
+
+# Count white pixels in a binary (0/255) image in a single pass; chosen once
+# at import. OpenCV's SIMD countNonZero is the real path, the others are defensive.
+if hasattr(cv2, 'countNonZero'):
+    _count_white = cv2.countNonZero
+elif numba is not None:
+    @numba.njit(cache=True, boundscheck=False, fastmath=True)
+    def _count_white(binary):
+        white = 0
+        for value in binary.flat:
+            if value == 255:
+                white += 1
+        return white
+else:
+    def _count_white(binary):
+        return int(np.count_nonzero(binary))
+
 
 class RecipeOCRPipeline:
-    def __init__(self, ollama_model="llama3.1:8b", ollama_url="http://localhost:11434"):
+    def __init__(self, ollama_model="llama3.1:8b", ollama_url="http://localhost:11434", debug_dir="."):
         """
         Initialize the recipe OCR pipeline
         
         Args:
             ollama_model: Name of the Ollama model to use
             ollama_url: URL of the Ollama API endpoint
+            debug_dir: Directory for preprocessing debug images and OCR text files
         """
         self.ollama_model = ollama_model
         self.ollama_url = ollama_url
+        self.debug_dir = Path(debug_dir)
+        
+        # Reuse HTTP connections to Ollama across recipes (keep-alive)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Scratch images reused by preprocess_image across recipes (one caller at a time)
+        self._buffers = {}
+        
+        # tesserocr API, created on first OCR call so only OCR processes load it
+        self._tess_api = None
+        self._tess_api_failed = False
+    
+    def _buffer(self, name, shape):
+        """
+        Get a reusable uint8 scratch image, reallocating only when the shape changes
+        
+        Args:
+            name: Buffer name
+            shape: Required (height, width)
+            
+        Returns:
+            numpy.ndarray: Buffer to pass as an OpenCV dst
+        """
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, np.uint8)
+            self._buffers[name] = buf
+        return buf
     
     def preprocess_image(self, image_path, debug=False):
         """
@@ -41,23 +224,46 @@ class RecipeOCRPipeline:
         """
         print(f"Preprocessing image: {image_path}")
         
-        # Read image with OpenCV
-        img = cv2.imread(str(image_path))
+        # Read image with OpenCV, converting to grayscale while decoding
+        gray = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
         
-        if debug:
-            cv2.imwrite("debug_01_original.jpg", img)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            raise FileNotFoundError(f"Could not read image: {image_path}")
         
         if debug:
-            cv2.imwrite("debug_02_grayscale.jpg", gray)
+            # The color original is only needed for the debug output
+            cv2.imwrite(str(self.debug_dir / "debug_01_original.jpg"), cv2.imread(str(image_path)))
+            cv2.imwrite(str(self.debug_dir / "debug_02_grayscale.jpg"), gray)
         
-        # Light denoising to reduce background texture (like granite)
-        denoised = cv2.fastNlMeansDenoising(gray, None, h=10, templateWindowSize=7, searchWindowSize=21)
+        # Width Tesseract works best at, with a cap on height
+        target_width = 2400  # Good balance for OCR
+        max_height = 5000
+        
+        # Shrink photos wider than the OCR target so denoising and thresholding
+        # touch fewer pixels; a shrunk image is never enlarged again below
+        height, width = gray.shape
+        downscaled = False
+        if width > target_width:
+            scale = target_width / width
+            new_size = (round(width * scale), round(height * scale))
+            gray = cv2.resize(
+                gray,
+                new_size,
+                dst=self._buffer('downscaled', new_size[::-1]),
+                interpolation=cv2.INTER_AREA
+            )
+            downscaled = True
+            print(f"Downscaled image to {gray.shape[1]}x{gray.shape[0]}")
+        
+        # Light edge-preserving denoising to reduce background texture (like granite)
+        # Much cheaper than non-local means; adaptive thresholding tolerates what remains
+        denoised = cv2.bilateralFilter(
+            gray, d=5, sigmaColor=50, sigmaSpace=50,
+            dst=self._buffer('denoised', gray.shape)
+        )
         
         if debug:
-            cv2.imwrite("debug_03_denoised.jpg", denoised)
+            cv2.imwrite(str(self.debug_dir / "debug_03_denoised.jpg"), denoised)
         
         # Use adaptive thresholding - works great for varied lighting and backgrounds
         # This creates a binary image (black text on white background)
@@ -67,44 +273,44 @@ class RecipeOCRPipeline:
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY,
             blockSize=15,  # Size of neighborhood for threshold calculation
-            C=10           # Constant subtracted from mean
+            C=10,          # Constant subtracted from mean
+            dst=self._buffer('binary', denoised.shape)
         )
         
         if debug:
-            cv2.imwrite("debug_04_adaptive_threshold.jpg", binary)
+            cv2.imwrite(str(self.debug_dir / "debug_04_adaptive_threshold.jpg"), binary)
         
         # Check if we need to invert (if background became black)
-        # Count white vs black pixels
-        white_pixels = np.sum(binary == 255)
-        black_pixels = np.sum(binary == 0)
+        # Count white vs black pixels in a single pass (binary is strictly 0/255)
+        white_pixels = _count_white(binary)
+        black_pixels = binary.size - white_pixels
         
         # If more black than white, we probably need to invert
         if black_pixels > white_pixels:
-            binary = cv2.bitwise_not(binary)
+            cv2.bitwise_not(binary, dst=binary)
             print("Inverted image (dark background detected)")
             if debug:
-                cv2.imwrite("debug_05_inverted.jpg", binary)
+                cv2.imwrite(str(self.debug_dir / "debug_05_inverted.jpg"), binary)
         
         # Light morphological operations to clean up
-        # Close small gaps in text
+        # Close small gaps in text (new array, since it is returned to the caller)
         kernel = np.ones((2, 2), np.uint8)
         cleaned = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
         
         if debug:
-            cv2.imwrite("debug_06_cleaned.jpg", cleaned)
+            cv2.imwrite(str(self.debug_dir / "debug_06_cleaned.jpg"), cleaned)
         
-        # Upscale if needed, but keep it reasonable
+        # Upscale small images if needed, but keep it reasonable
         height, width = cleaned.shape
-        target_width = 2400  # Good balance for OCR
         
-        if width < target_width:
+        if width < target_width and not downscaled:
             scale = target_width / width
             new_width = int(width * scale)
             new_height = int(height * scale)
             
             # Safety check
-            if new_height > 5000:
-                scale = 5000 / height
+            if new_height > max_height:
+                scale = max_height / height
                 new_width = int(width * scale)
                 new_height = int(height * scale)
             
@@ -112,7 +318,7 @@ class RecipeOCRPipeline:
             print(f"Upscaled image to {new_width}x{new_height}")
             
             if debug:
-                cv2.imwrite("debug_07_upscaled.jpg", cleaned)
+                cv2.imwrite(str(self.debug_dir / "debug_07_upscaled.jpg"), cleaned)
         
         return cleaned
     
@@ -138,20 +344,115 @@ class RecipeOCRPipeline:
         # PSM 3: Fully automatic page segmentation
         
         # Try PSM 6 first (best for structured recipe cards)
-        custom_config = r'--oem 3 --psm 6'
-        text = pytesseract.image_to_string(img, config=custom_config)
+        text, mean_conf = self._run_tesseract(img, psm=6)
         
-        print(f"Extracted {len(text)} characters")
+        print(f"Extracted {len(text)} characters (mean confidence {mean_conf:.0f})")
         
-        # If result is suspiciously short, try PSM 3 (fully automatic)
-        if len(text.strip()) < 50:
+        # If Tesseract was unsure, try PSM 3 (fully automatic) and keep the more confident result
+        if mean_conf < _MIN_MEAN_CONFIDENCE:
             print("Trying automatic page segmentation (PSM 3)...")
-            custom_config = r'--oem 3 --psm 3'
-            text = pytesseract.image_to_string(img, config=custom_config)
-            print(f"Re-extracted {len(text)} characters")
+            auto_text, auto_conf = self._run_tesseract(img, psm=3)
+            print(f"Re-extracted {len(auto_text)} characters (mean confidence {auto_conf:.0f})")
+            
+            if auto_conf > mean_conf:
+                text = auto_text
         
         return text
     
+    def _run_tesseract(self, img, psm):
+        """
+        Run a single Tesseract pass and rebuild the text from confident words
+        
+        Args:
+            img: Preprocessed image
+            psm: Tesseract page segmentation mode
+            
+        Returns:
+            tuple: (text: str, mean_confidence: float)
+        """
+        api = self._tesserocr_api()
+        if api is not None:
+            return _join_words(self._tesserocr_words(api, img, psm))
+        
+        # pytesseract writes its input to a temp file in the image's format;
+        # BMP is much cheaper to encode than its default PNG
+        pil_img = Image.fromarray(img)
+        pil_img.format = 'BMP'
+        
+        data = pytesseract.image_to_data(
+            pil_img,
+            config=f'--oem 3 --psm {psm}',
+            output_type=pytesseract.Output.DICT,
+            timeout=_TESSERACT_TIMEOUT
+        )
+        
+        words = (
+            ((data['block_num'][i], data['par_num'][i], data['line_num'][i]), word, float(data['conf'][i]))
+            for i, word in enumerate(data['text'])
+        )
+        return _join_words(words)
+    
+    def _tesserocr_api(self):
+        """
+        Get the persistent tesserocr API, creating it on first use
+        
+        Returns:
+            tesserocr.PyTessBaseAPI or None: None if tesserocr is not installed or
+            cannot be initialized (e.g. missing tessdata), so pytesseract is used instead
+        """
+        if tesserocr is None or self._tess_api_failed:
+            return None
+        
+        if self._tess_api is None:
+            try:
+                self._tess_api = tesserocr.PyTessBaseAPI(oem=tesserocr.OEM.DEFAULT)
+            except RuntimeError as e:
+                print(f"Warning: could not initialize tesserocr ({e}), using pytesseract")
+                self._tess_api_failed = True
+                return None
+        
+        return self._tess_api
+    
+    def _tesserocr_words(self, api, img, psm):
+        """
+        Recognize words with a persistent tesserocr API (language data loaded once)
+        
+        Args:
+            api: tesserocr API from _tesserocr_api
+            img: Preprocessed image
+            psm: Tesseract page segmentation mode
+            
+        Returns:
+            list: ((block, paragraph, line), word, confidence) tuples
+        """
+        api.SetPageSegMode(psm)  # tesserocr.PSM values match Tesseract's --psm numbers
+        # Hand over the raw 8-bit pixels; no PIL conversion or image encoding
+        height, width = img.shape
+        api.SetImageBytes(np.ascontiguousarray(img).tobytes(), width, height, 1, width)
+        
+        # Bounded like the pytesseract path, so a stuck page cannot stall the batch
+        if not api.Recognize(timeout=_TESSERACT_TIMEOUT * 1000):
+            raise RuntimeError("Tesseract recognition failed or timed out")
+        
+        iterator = api.GetIterator()
+        if iterator is None:
+            return []
+        
+        # Number blocks, paragraphs and lines as the iterator enters them
+        words = []
+        block = paragraph = line = 0
+        level = tesserocr.RIL.WORD
+        for result in tesserocr.iterate_level(iterator, level):
+            if result.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+                block += 1
+            if result.IsAtBeginningOf(tesserocr.RIL.PARA):
+                paragraph += 1
+            if result.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line += 1
+            words.append(((block, paragraph, line), result.GetUTF8Text(level) or '', result.Confidence(level)))
+        
+        return words
+    
     def clean_ocr_text(self, text):
         """
         Clean up common OCR errors
@@ -163,21 +464,42 @@ class RecipeOCRPipeline:
             str: Cleaned text
         """
         # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        
-        # Fix common fraction issues
-        text = text.replace('1/2', '½')
-        text = text.replace('1/4', '¼')
-        text = text.replace('3/4', '¾')
-        text = text.replace('1/3', '⅓')
-        text = text.replace('2/3', '⅔')
+        text = _BLANK_LINES_RE.sub('\n\n', text)
         
-        # Common OCR errors
-        text = text.replace('l/2', '½')
-        text = text.replace('l/4', '¼')
+        # Fix common fraction issues and OCR errors (l/2 → ½) in one pass
+        text = _FRACTION_RE.sub(lambda m: _FRACTION_MAP[m.group(0)], text)
         
         return text.strip()
     
+    def warmup(self):
+        """
+        Load the Ollama model ahead of the first recipe and keep it resident
+        
+        Returns:
+            bool: Whether the model was loaded
+        """
+        print(f"Loading Ollama model ({self.ollama_model})...")
+        
+        try:
+            # An empty prompt loads the model without generating anything
+            response = self.session.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.ollama_model,
+                    "prompt": "",
+                    "stream": False,
+                    "keep_alive": _OLLAMA_KEEP_ALIVE
+                },
+                timeout=120
+            )
+            response.raise_for_status()
+            return True
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Warning: could not preload model: {e}")
+            print("Make sure Ollama is running (ollama serve)")
+            return False
+    
     def extract_recipe_with_llm(self, ocr_text):
         """
         Use local LLM to extract structured recipe data
@@ -227,13 +549,15 @@ Important rules:
 - Ensure valid JSON formatting"""
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.ollama_url}/api/generate",
                 json={
                     "model": self.ollama_model,
                     "prompt": prompt,
                     "stream": False,
-                    "format": "json"
+                    "format": "json",
+                    "keep_alive": _OLLAMA_KEEP_ALIVE,
+                    "options": {"num_ctx": 4096, "temperature": 0}
                 },
                 timeout=120
             )
@@ -270,40 +594,22 @@ Important rules:
         """
         print("Generating markdown...")
         
-        # Extract data with defaults
-        title = recipe_data.get('title', 'Untitled Recipe')
-        origin = recipe_data.get('origin', recipe_data.get('source', 'Unknown'))
-        servings = recipe_data.get('servings', 'Unknown')
-        prep_time = recipe_data.get('prep_time', 'Unknown')
-        cook_time = recipe_data.get('cook_time', 'Unknown')
-        total_time = recipe_data.get('total_time', 'Unknown')
+        # Extract header data with defaults
+        header = {key: recipe_data.get(key, default) for key, default in _HEADER_DEFAULTS.items()}
+        if 'origin' not in recipe_data:
+            header['origin'] = recipe_data.get('source', 'Unknown')
+        title = header['title']
         description = recipe_data.get('description', '').strip()
         
-        # Create markdown content with cookbook template
-        markdown = f"""---
-cssclass: cookbook
-tags: recipe
----
-# {title}
-
-<div class="recipe-origin">
-<strong>Origin:</strong> {origin}
-</div>
-
-<div class="recipe-meta">
-<span><strong>Serves:</strong> {servings}</span>
-<span><strong>Prep Time:</strong> {prep_time}</span>
-<span><strong>Cook Time:</strong> {cook_time}</span>
-<span><strong>Total Time:</strong> {total_time}</span>
-</div>
-
-"""
+        # Collect markdown pieces and join once at the end
+        # Header uses the cookbook template
+        parts = [_MARKDOWN_HEADER.format_map(header)]
         
         # Only add description if it exists and is not a placeholder
         if description and description != '[Brief description of the dish]':
-            markdown += f"{description}\n\n"
+            parts.append(f"{description}\n\n")
         
-        markdown += "## Ingredients\n\n"
+        parts.append("## Ingredients\n\n")
         
         # Add ingredients (handle grouped ingredients if present)
         ingredients = recipe_data.get('ingredients', [])
@@ -312,15 +618,15 @@ tags: recipe
         if ingredient_groups:
             # Ingredients are organized into groups
             for group_name, group_items in ingredient_groups.items():
-                markdown += f"\n**{group_name}**\n"
+                parts.append(f"\n**{group_name}**\n")
                 for ingredient in group_items:
-                    markdown += f"- {ingredient}\n"
+                    parts.append(f"- {ingredient}\n")
         elif ingredients:
             # Simple ingredient list
             for ingredient in ingredients:
-                markdown += f"- {ingredient}\n"
+                parts.append(f"- {ingredient}\n")
         
-        markdown += "\n## Instructions\n\n"
+        parts.append("\n## Instructions\n\n")
         
         # Add instructions
         instructions = recipe_data.get('instructions', [])
@@ -328,13 +634,13 @@ tags: recipe
             # Try to format with bold action verb if not already formatted
             if instruction.strip() and not instruction.startswith('**'):
                 # Try to extract first sentence/action as bold
-                parts = instruction.split('.', 1)
-                if len(parts) > 1:
-                    markdown += f"{i}. **{parts[0].strip()}.** {parts[1].strip()}\n\n"
+                sentences = instruction.split('.', 1)
+                if len(sentences) > 1:
+                    parts.append(f"{i}. **{sentences[0].strip()}.** {sentences[1].strip()}\n\n")
                 else:
-                    markdown += f"{i}. **{instruction.strip()}**\n\n"
+                    parts.append(f"{i}. **{instruction.strip()}**\n\n")
             else:
-                markdown += f"{i}. {instruction}\n\n"
+                parts.append(f"{i}. {instruction}\n\n")
         
         # Check if there are any actual notes
         notes = recipe_data.get('notes', {})
@@ -348,62 +654,48 @@ tags: recipe
         
         # Only add notes section if there are actual notes
         if has_notes:
-            markdown += '<div class="notes-section">\n\n## Notes & Variations\n\n'
+            parts.append('<div class="notes-section">\n\n## Notes & Variations\n\n')
             
             if isinstance(notes, dict):
-                if notes.get('make_ahead'):
-                    markdown += f"- **Make-Ahead:** {notes['make_ahead']}\n"
-                if notes.get('substitutions'):
-                    markdown += f"- **Substitutions:** {notes['substitutions']}\n"
-                if notes.get('storage'):
-                    markdown += f"- **Storage:** {notes['storage']}\n"
-                if notes.get('tips'):
-                    markdown += f"- **Tips:** {notes['tips']}\n"
-                if notes.get('scaling'):
-                    markdown += f"- **Scaling:** {notes['scaling']}\n"
-                if notes.get('family_notes'):
-                    markdown += f"- **Family Notes:** {notes['family_notes']}\n"
+                parts.extend(
+                    f"- **{label}:** {notes[key]}\n"
+                    for key, label in _NOTE_LABELS
+                    if notes.get(key)
+                )
             elif isinstance(notes, str):
-                markdown += f"- **Tips:** {notes}\n"
+                parts.append(f"- **Tips:** {notes}\n")
             
-            markdown += '\n</div>\n\n'
+            parts.append('\n</div>\n\n')
         
         # Add chef's note if present
         chefs_note = recipe_data.get('chefs_note', recipe_data.get('personal_note', '')).strip()
         if chefs_note:
-            markdown += f'> **Chef\'s Note:** {chefs_note}\n'
+            parts.append(f'> **Chef\'s Note:** {chefs_note}\n')
         
         # Determine output path
         if output_path is None:
             # Create sanitized filename from title
-            safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
-            output_path = f"{safe_title}.md"
+            output_path = f"{_safe_filename(title)}.md"
         
         # Write to file
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown)
+            f.write(''.join(parts))
         
         print(f"Markdown saved to: {output_path}")
         return output_path
     
-    def process_recipe(self, image_path, output_path=None, save_ocr=False, debug=False):
+    def extract_clean_text(self, image_path, save_ocr=False, debug=False):
         """
-        Complete pipeline: image → OCR → LLM → markdown
+        OCR stage: image → cleaned OCR text
         
         Args:
             image_path: Path to recipe image
-            output_path: Optional output path for markdown
             save_ocr: Whether to save raw OCR text
             debug: Whether to show debug output and save preprocessing steps
             
         Returns:
-            str: Path to generated markdown file
+            str: Cleaned OCR text
         """
-        print(f"\n{'='*60}")
-        print(f"Processing recipe: {image_path}")
-        print(f"{'='*60}\n")
-        
-        # Step 1: OCR
         ocr_text = self.extract_text_ocr(image_path, debug=debug)
         cleaned_text = self.clean_ocr_text(ocr_text)
         
@@ -415,13 +707,28 @@ tags: recipe
             print(cleaned_text)
             print("="*60 + "\n")
         
-        # Always save OCR text for debugging
-        ocr_path = Path(image_path).stem + "_ocr.txt"
-        with open(ocr_path, 'w', encoding='utf-8') as f:
-            f.write(cleaned_text)
-        print(f"OCR text saved to: {ocr_path}")
+        # Save OCR text only when requested or debugging
+        if debug or save_ocr:
+            ocr_path = self.debug_dir / f"{Path(image_path).stem}_ocr.txt"
+            with open(ocr_path, 'w', encoding='utf-8') as f:
+                f.write(cleaned_text)
+            print(f"OCR text saved to: {ocr_path}")
         
-        # Step 2: LLM extraction
+        return cleaned_text
+    
+    def text_to_markdown(self, cleaned_text, output_path=None, output_dir=None, debug=False):
+        """
+        LLM stage: cleaned OCR text → structured recipe → markdown
+        
+        Args:
+            cleaned_text: Cleaned OCR text
+            output_path: Optional output path for markdown
+            output_dir: Directory for the auto-named markdown file (default: current directory)
+            debug: Whether to show debug output
+            
+        Returns:
+            str: Path to generated markdown file
+        """
         recipe_data = self.extract_recipe_with_llm(cleaned_text)
         
         # Show extracted data in debug mode
@@ -432,18 +739,45 @@ tags: recipe
             print(json.dumps(recipe_data, indent=2))
             print("="*60 + "\n")
         
-        # Step 3: Generate markdown with auto-filename from recipe title
+        # Generate markdown with auto-filename from recipe title
         if output_path is None:
             # Use recipe title for filename
             title = recipe_data.get('title', 'recipe')
-            safe_title = re.sub(r'[^\w\s-]', '', title).strip().replace(' ', '_')
-            output_path = f"{safe_title}.md"
+            output_path = f"{_safe_filename(title)}.md"
+            if output_dir is not None:
+                output_path = str(Path(output_dir) / output_path)
         
         markdown_path = self.generate_markdown(recipe_data, output_path)
         
+        print(f"Recipe title: {recipe_data.get('title', 'Unknown')}")
+        
+        return markdown_path
+    
+    def process_recipe(self, image_path, output_path=None, save_ocr=False, debug=False):
+        """
+        Complete pipeline: image → OCR → LLM → markdown
+        
+        Args:
+            image_path: Path to recipe image
+            output_path: Optional output path for markdown
+            save_ocr: Whether to save raw OCR text
+            debug: Whether to show debug output and save preprocessing steps
+            
+        Returns:
+            str: Path to generated markdown file
+        """
+        print(f"\n{'='*60}")
+        print(f"Processing recipe: {image_path}")
+        print(f"{'='*60}\n")
+        
+        # Step 1: OCR
+        cleaned_text = self.extract_clean_text(image_path, save_ocr=save_ocr, debug=debug)
+        
+        # Step 2 + 3: LLM extraction and markdown generation
+        markdown_path = self.text_to_markdown(cleaned_text, output_path, debug=debug)
+        
         print(f"\n{'='*60}")
         print("Processing complete!")
-        print(f"Recipe title: {recipe_data.get('title', 'Unknown')}")
         print(f"{'='*60}\n")
         
         return markdown_path
@@ -474,7 +808,7 @@ def main():
     parser.add_argument(
         "--save-ocr",
         action="store_true",
-        help="Save raw OCR text to file (now always saved for debugging)"
+        help="Save raw OCR text to file (always saved with --debug)"
     )
     parser.add_argument(
         "--debug",